@@ -13,6 +13,7 @@ from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 from arxiv_db import ArxivDatabase
 from twitter_search import TwitterSearch
+from source_guard import ResilientSource, RetryableError, SourceUnavailable, THROTTLE_STATUSES, parse_retry_after
 
 # Load environment variables from .env file
 load_dotenv()
@@ -20,6 +21,9 @@ load_dotenv()
 RESULTS_DIR = 'results'
 os.makedirs(RESULTS_DIR, exist_ok=True)
 
+SCHOLAR = ResilientSource('scholar')
+SCHOLAR_SESSION = requests.Session()
+
 def read_keywords(file_path):
     try:
         with open(file_path, 'r') as f:
@@ -150,7 +154,75 @@ def parse_arxiv_results(xml_response):
     
     return results
 
-def get_citation_count(arxiv_id):
+# gs_r can appear anywhere in the class list, but gs_rt/gs_ri must not match
+SCHOLAR_RESULT_START = re.compile(r'<div\b[^>]*\bclass="(?:[^"]*\s)?gs_r[\s"]')
+SCHOLAR_RESULTS_END = re.compile(r'id="(?:gs_res_ccl_bot|gs_n|gs_ftr)"')
+SCHOLAR_CITED_BY = re.compile(r'Cited by (\d+)')
+
+SCHOLAR_BLOCK_MARKERS = re.compile(r'gs_captcha|g-recaptcha|unusual traffic', re.IGNORECASE)
+
+def is_scholar_block_page(html, url=''):
+    # Scholar answers heavy use with a CAPTCHA page (often served as 200) or
+    # a redirect to google.com/sorry/. Only pages without a results list are
+    # checked, since a result snippet may well mention "unusual traffic".
+    if '/sorry/' in url:
+        return True
+    if 'id="gs_res_ccl_mid"' in html:
+        return False
+    return bool(SCHOLAR_BLOCK_MARKERS.search(html))
+
+def arxiv_id_pattern(arxiv_id):
+    # Guard both ends so 2307.1504 does not match inside 2307.15043
+    return re.compile(r'(?<![\d.])' + re.escape(arxiv_id) + r'(?![\d])')
+
+def _scholar_result_blocks(html):
+    # Pagination and footer links repeat the query (and so the arXiv ID),
+    # so the last result has to end where they begin
+    end_match = SCHOLAR_RESULTS_END.search(html)
+    end = end_match.start() if end_match else len(html)
+    
+    begin = None
+    for match in SCHOLAR_RESULT_START.finditer(html, 0, end):
+        if begin is not None:
+            yield html[begin:match.start()]
+        begin = match.start()
+    if begin is not None:
+        yield html[begin:end]
+
+def _extract_citations_soup(html, id_pattern):
+    soup = BeautifulSoup(html, 'html.parser')
+    
+    for result in soup.find_all('div', class_=['gs_r', 'gs_ri']):
+        if not id_pattern.search(str(result)):
+            continue
+        for part in result.find_all('div', class_='gs_fl'):
+            citation_match = SCHOLAR_CITED_BY.search(part.text)
+            if citation_match:
+                return int(citation_match.group(1))
+        return 0
+    
+    return None
+
+def extract_scholar_citations(html, arxiv_id):
+    # Returns None when no result is about this paper; 0 is only for a
+    # matched result without a "Cited by" link. Block pages are rejected
+    # before this by is_scholar_block_page.
+    id_pattern = arxiv_id_pattern(arxiv_id)
+    
+    found_results = False
+    for block in _scholar_result_blocks(html):
+        found_results = True
+        if id_pattern.search(block):
+            citation_match = SCHOLAR_CITED_BY.search(block)
+            return int(citation_match.group(1)) if citation_match else 0
+    
+    if found_results:
+        return None
+    
+    # Result markup not recognized; fall back to a full parse
+    return _extract_citations_soup(html, id_pattern)
+
+def fetch_citation_count(arxiv_id, source=SCHOLAR):
     url = f"https://scholar.google.com/scholar?hl=en&as_sdt=0%2C5&q=arXiv%3A{arxiv_id}&btnG="
     
     headers = {
@@ -159,28 +231,41 @@ def get_citation_count(arxiv_id):
         'Accept-Language': 'en-US,en;q=0.5',
     }
     
-    try:
-        response = requests.get(url, headers=headers)
+    def fetch():
+        try:
+            response = SCHOLAR_SESSION.get(url, headers=headers, timeout=30)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            raise RetryableError(f"network error: {e}")
         
-        if response.status_code == 200:
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            citation_parts = soup.find_all('div', class_='gs_fl')
-            
-            for part in citation_parts:
-                citation_text = part.text
-                if 'Cited by' in citation_text:
-                    citation_match = re.search(r'Cited by (\d+)', citation_text)
-                    if citation_match:
-                        return int(citation_match.group(1))
-            
-            return 0
-        else:
-            print(f"Failed to retrieve citation data for {arxiv_id}: {response.status_code}")
-            return 0
+        if response.status_code in THROTTLE_STATUSES:
+            raise RetryableError(f"status {response.status_code}", response.status_code,
+                                 parse_retry_after(response.headers.get('Retry-After')))
+        if is_scholar_block_page(response.text, response.url):
+            raise RetryableError("blocked by CAPTCHA page", 429)
+        return response
+    
+    # Raises SourceUnavailable when the circuit is open or retries ran out
+    response = source.call(fetch)
+    
+    if response.status_code == 200:
+        citations = extract_scholar_citations(response.text, arxiv_id)
+        if citations is None:
+            print(f"No Google Scholar result matched {arxiv_id}")
+        return citations
+    else:
+        print(f"Failed to retrieve citation data for {arxiv_id}: {response.status_code}")
+        return None
+
+def get_citation_count(arxiv_id):
+    # None means the count is unknown, so stored data is left alone
+    try:
+        return fetch_citation_count(arxiv_id)
+    except SourceUnavailable as e:
+        print(f"Skipping Google Scholar for {arxiv_id}: {e}")
+        return None
     except Exception as e:
         print(f"Error accessing Google Scholar for {arxiv_id}: {e}")
-        return 0
+        return None
 
 def get_twitter_mentions(arxiv_id):
     print(f"Fetching Twitter mentions for arXiv:{arxiv_id}")
@@ -192,12 +277,13 @@ def get_twitter_mentions(arxiv_id):
     if not twitter.api_client:
         print("Warning: Twitter API tokens not available in .env file or environment variables")
         print("Add TWITTER_AUTH_TOKEN and TWITTER_CT0_TOKEN to your .env file")
-        return 0
+        return None
     
     # Use TwitterSearch to get actual tweet counts
     count = twitter.get_tweet_count(arxiv_id, delay=5.0)
     
-    print(f"Found {count} tweets mentioning arXiv:{arxiv_id}")
+    if count is not None:
+        print(f"Found {count} tweets mentioning arXiv:{arxiv_id}")
     return count
 
 def enrich_papers_with_metrics(papers):
@@ -210,11 +296,11 @@ def enrich_papers_with_metrics(papers):
             
             citations = get_citation_count(arxiv_id)
             papers[i]['citations'] = citations
-            print(f"Citations: {citations}")
+            print(f"Citations: {citations if citations is not None else 'unknown'}")
             
             tweets = get_twitter_mentions(arxiv_id)
             papers[i]['tweets'] = tweets
-            print(f"Twitter mentions: {tweets}")
+            print(f"Twitter mentions: {tweets if tweets is not None else 'unknown'}")
             
             # No need for additional sleep since get_twitter_mentions already has rate limiting
         else:
@@ -25,9 +25,13 @@ class ArxivDatabase:
         self.db = self.client['arxivdump']
         self.papers = self.db['papers']
         self.papers.create_index("arxiv_id", unique=True)
+        self.refresh_queue = self.db['refresh_queue']
+        self.refresh_queue.create_index("arxiv_id", unique=True)
+        self.refresh_queue.create_index("priority")
         
         if clear_db:
             self.papers.delete_many({})
+            self.refresh_queue.delete_many({})
             print("Database cleared")
     
     def insert_papers(self, papers_list):
@@ -42,9 +46,16 @@ class ArxivDatabase:
             print(f"Skipping paper with no arXiv ID: {paper.get('title', 'Unknown')}")
             return False
         
-        paper['db_updated'] = datetime.datetime.now()
         existing = self.papers.find_one({"arxiv_id": paper['arxiv_id']})
         
+        # Only count this as a refresh when at least one metric was fetched
+        if paper.get('citations') is not None or paper.get('tweets') is not None:
+            paper['db_updated'] = datetime.datetime.now()
+        elif existing and existing.get('db_updated'):
+            paper['db_updated'] = existing['db_updated']
+        else:
+            paper.pop('db_updated', None)
+        
         if existing:
             if existing.get('db_updated'):
                 update_cutoff = datetime.datetime.now() - datetime.timedelta(days=7)
@@ -53,7 +64,12 @@ class ArxivDatabase:
                         paper['citations'] = existing['citations']
                     if existing.get('tweets') is not None:
                         paper['tweets'] = existing['tweets']
-            
+
+            # A None metric means the source could not be reached; keep what we had
+            for metric in ('citations', 'tweets'):
+                if paper.get(metric) is None and existing.get(metric) is not None:
+                    paper[metric] = existing[metric]
+
             self.papers.replace_one({"arxiv_id": paper['arxiv_id']}, paper)
             print(f"Updated paper: {paper['arxiv_id']} - {paper['title']}")
         else:
@@ -66,6 +82,28 @@ class ArxivDatabase:
         
         return True
     
+    def update_metrics(self, arxiv_id, citations=None, tweets=None):
+        existing = self.papers.find_one({"arxiv_id": arxiv_id})
+        if not existing:
+            return False
+        
+        # Unknown (None) metrics are skipped so they never replace stored counts
+        changes = {}
+        for metric, value in (('citations', citations), ('tweets', tweets)):
+            if value is not None and existing.get(metric) != value:
+                changes[metric] = value
+        
+        fields = dict(changes)
+        if citations is not None or tweets is not None:
+            fields['db_updated'] = datetime.datetime.now()
+        if fields:
+            self.papers.update_one({"arxiv_id": arxiv_id}, {"$set": fields})
+        
+        return bool(changes)
+    
+    def get_paper(self, arxiv_id):
+        return self.papers.find_one({"arxiv_id": arxiv_id})
+    
     def get_all_papers(self):
         return list(self.papers.find())
     
@@ -120,6 +158,18 @@ class ArxivDatabase:
         
         return list(self.papers.find(query))
     
+    def save_refresh_job(self, job):
+        self.refresh_queue.replace_one({"arxiv_id": job['arxiv_id']}, job, upsert=True)
+    
+    def get_refresh_job(self, arxiv_id):
+        return self.refresh_queue.find_one({"arxiv_id": arxiv_id})
+    
+    def get_refresh_jobs(self):
+        return list(self.refresh_queue.find())
+    
+    def next_refresh_job(self):
+        return self.refresh_queue.find_one({"priority": {"$gt": 0}}, sort=[("priority", -1)])
+    
     def close(self):
         self.client.close()
 
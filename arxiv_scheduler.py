@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+import sys
+import time
+import signal
+import datetime
+from dotenv import load_dotenv
+from arxiv_db import ArxivDatabase
+from arxiv_visualizer import ArxivVisualizer
+from arxiv_collector import read_keywords, search_arxiv, parse_arxiv_results, fetch_citation_count
+from twitter_search import TwitterSearch
+from source_guard import ResilientSource, RateBudget, SourceUnavailable
+
+load_dotenv()
+
+# Papers whose metrics were never fetched always go before everything else
+NEW_PAPER_PRIORITY = 1e9
+
+# Failed refreshes wait 1h, 2h, 4h, ... up to two days before the next try
+FAILURE_BACKOFF_HOURS = 1.0
+FAILURE_BACKOFF_MAX_HOURS = 48.0
+
+def refresh_priority(job, now, min_refresh_hours=6.0):
+    failures = job.get('failures', 0)
+    if failures and job.get('last_attempt') is not None:
+        backoff_hours = min(FAILURE_BACKOFF_MAX_HOURS, FAILURE_BACKOFF_HOURS * 2 ** (failures - 1))
+        if (now - job['last_attempt']).total_seconds() / 3600 < backoff_hours:
+            return 0
+
+    last_refreshed = job.get('last_refreshed')
+    if last_refreshed is None:
+        return NEW_PAPER_PRIORITY
+
+    hours = (now - last_refreshed).total_seconds() / 3600
+    if hours < min_refresh_hours:
+        return 0
+
+    # Stale papers rise over time, and papers that are gaining citations or
+    # tweets quickly rise faster
+    return hours * (1 + job.get('velocity', 0.0))
+
+def metric_velocity(previous, current, days, old_velocity=0.0):
+    if days <= 0:
+        return old_velocity
+
+    delta = 0
+    for metric in ('citations', 'tweets'):
+        if previous.get(metric) is not None and current.get(metric) is not None:
+            delta += abs(current[metric] - previous[metric])
+
+    # Smooth so a single jump does not dominate the ordering for long
+    return 0.5 * old_velocity + 0.5 * (delta / days)
+
+class RefreshScheduler:
+    def __init__(self, keywords, max_results=50, search_hours=12.0, scholar_per_hour=30,
+                 twitter_per_hour=30, min_refresh_hours=6.0, render_minutes=10.0, render=True):
+        self.keywords = keywords
+        self.max_results = max_results
+        self.search_interval = search_hours * 3600
+        self.min_refresh_hours = min_refresh_hours
+        self.render_interval = render_minutes * 60
+        self.render = render
+        self.reprioritize_interval = 15 * 60
+        self.idle_sleep = 60
+
+        # One database connection and one Twitter client for the whole run
+        self.db = ArxivDatabase(clear_db=False)
+        self.twitter = TwitterSearch()
+        self.visualizer = ArxivVisualizer(db=self.db) if render else None
+        # Own sources so the budgets don't leak into other users of the
+        # module-level ones; charged per HTTP attempt, retries included
+        self.scholar = ResilientSource('scholar', budget=RateBudget(scholar_per_hour))
+        self.twitter_source = ResilientSource('twitter', max_retries=2, base_delay=5.0,
+                                              budget=RateBudget(twitter_per_hour))
+
+        self.changed = False
+        self.last_render = 0.0
+        # Keep one timestamped render per search cycle; the rest only update main.html
+        self.snapshot_due = True
+
+    def ensure_job(self, paper):
+        job = self.db.get_refresh_job(paper['arxiv_id'])
+        if job is not None:
+            return job
+
+        # Papers collected by earlier runs already have metrics, so they
+        # are queued by age rather than as new
+        has_metrics = paper.get('citations') is not None or paper.get('tweets') is not None
+        job = {
+            'arxiv_id': paper['arxiv_id'],
+            'added': datetime.datetime.now(),
+            'last_refreshed': paper.get('db_updated') if has_metrics else None,
+            'velocity': 0.0,
+            'failures': 0,
+            'last_attempt': None,
+        }
+        job['priority'] = refresh_priority(job, datetime.datetime.now(), self.min_refresh_hours)
+        self.db.save_refresh_job(job)
+        return job
+
+    def search_new_papers(self):
+        try:
+            xml_response = search_arxiv(self.keywords, max_results=self.max_results)
+            papers = parse_arxiv_results(xml_response)
+        except Exception as e:
+            print(f"Error searching arXiv: {e}")
+            return
+
+        added = 0
+        for paper in papers:
+            if not paper.get('arxiv_id'):
+                continue
+            # Queue known papers from the stored document so the job keeps
+            # their real last refresh time
+            stored = self.db.get_paper(paper['arxiv_id'])
+            if stored is None:
+                added += 1
+            self.db.insert_paper(paper)
+            self.ensure_job(stored if stored is not None else paper)
+
+        # New papers show up in the page before their metrics are known
+        if added:
+            self.changed = True
+        self.snapshot_due = True
+        print(f"Search queued {added} new papers")
+
+    def reprioritize(self):
+        now = datetime.datetime.now()
+        jobs = {job['arxiv_id']: job for job in self.db.get_refresh_jobs()}
+        for paper in self.db.get_all_papers():
+            if paper.get('arxiv_id') and paper['arxiv_id'] not in jobs:
+                jobs[paper['arxiv_id']] = self.ensure_job(paper)
+
+        for job in jobs.values():
+            priority = refresh_priority(job, now, self.min_refresh_hours)
+            if priority != job.get('priority'):
+                job['priority'] = priority
+                self.db.save_refresh_job(job)
+
+    def twitter_enabled(self):
+        return self.twitter.api_client is not None and self.twitter_source.available()
+
+    def fetch_metric(self, fetch, arxiv_id, source):
+        # Returns (value, held); held means the circuit breaker refused the call
+        try:
+            return fetch(arxiv_id, source=source), False
+        except SourceUnavailable as e:
+            print(f"Skipping {arxiv_id}: {e}")
+            return None, True
+        except Exception as e:
+            print(f"Error refreshing {arxiv_id}: {e}")
+            return None, False
+
+    def refresh_next(self):
+        if not self.scholar.available() and not self.twitter_enabled():
+            return False
+
+        job = self.db.next_refresh_job()
+        if job is None:
+            return False
+
+        arxiv_id = job['arxiv_id']
+        paper = self.db.get_paper(arxiv_id)
+        if paper is None:
+            job['priority'] = 0
+            self.db.save_refresh_job(job)
+            return True
+
+        print(f"\nRefreshing {arxiv_id} (priority {job['priority']:.1f})")
+        current = {'citations': None, 'tweets': None}
+        attempted = held = 0
+        if self.scholar.available():
+            attempted += 1
+            current['citations'], source_held = self.fetch_metric(fetch_citation_count, arxiv_id, self.scholar)
+            held += source_held
+        if self.twitter_enabled():
+            attempted += 1
+            current['tweets'], source_held = self.fetch_metric(self.twitter.fetch_tweet_count, arxiv_id, self.twitter_source)
+            held += source_held
+
+        now = datetime.datetime.now()
+        job['last_attempt'] = now
+        if current['citations'] is None and current['tweets'] is None:
+            if held == attempted:
+                # Only the breakers stopped us; keep the job where it is
+                # until they let requests through again
+                return False
+
+            # The sources answered but told us nothing; back off this job so
+            # the rest of the queue keeps draining
+            job['failures'] = job.get('failures', 0) + 1
+            job['priority'] = refresh_priority(job, now, self.min_refresh_hours)
+            self.db.save_refresh_job(job)
+            print(f"Refresh of {arxiv_id} failed ({job['failures']} in a row)")
+            return True
+
+        if self.db.update_metrics(arxiv_id, **current):
+            self.changed = True
+            print(f"Metrics changed for {arxiv_id}: {current}")
+
+        if job.get('last_refreshed') is not None:
+            days = (now - job['last_refreshed']).total_seconds() / 86400
+            job['velocity'] = metric_velocity(paper, current, days, job.get('velocity', 0.0))
+        job['last_refreshed'] = now
+        job['failures'] = 0
+        job['priority'] = refresh_priority(job, now, self.min_refresh_hours)
+        self.db.save_refresh_job(job)
+        return True
+
+    def render_if_changed(self, force=False):
+        if not self.render or not self.changed:
+            return
+        if not force and time.monotonic() - self.last_render < self.render_interval:
+            return
+
+        self.visualizer.generate_html(snapshot=self.snapshot_due)
+        self.changed = False
+        self.snapshot_due = False
+        self.last_render = time.monotonic()
+
+    def run(self):
+        next_search = 0.0
+        next_reprioritize = 0.0
+
+        try:
+            while True:
+                now = time.monotonic()
+                if now >= next_search:
+                    self.search_new_papers()
+                    next_search = now + self.search_interval
+                if now >= next_reprioritize:
+                    self.reprioritize()
+                    next_reprioritize = now + self.reprioritize_interval
+
+                refreshed = self.refresh_next()
+                self.render_if_changed()
+                if not refreshed:
+                    time.sleep(self.idle_sleep)
+        finally:
+            self.render_if_changed(force=True)
+            self.db.close()
+
+def main():
+    keywords_file = "tags.txt"
+    options = {}
+
+    numeric_args = {
+        "--max=": ("max_results", int),
+        "--search-hours=": ("search_hours", float),
+        "--scholar-per-hour=": ("scholar_per_hour", float),
+        "--twitter-per-hour=": ("twitter_per_hour", float),
+        "--min-refresh-hours=": ("min_refresh_hours", float),
+        "--render-minutes=": ("render_minutes", float),
+    }
+
+    for arg in sys.argv[1:]:
+        if arg == "--help":
+            print("""
+ArXiv Scheduler - Keep paper metrics fresh from a long-running process
+
+Usage:
+  python arxiv_scheduler.py [options]
+
+Options:
+  --keywords=FILE           Specify keywords file (default: tags.txt)
+  --max=NUMBER              Maximum number of results per arXiv search (default: 50)
+  --search-hours=HOURS      Hours between arXiv searches (default: 12)
+  --scholar-per-hour=N      Google Scholar request budget (default: 30)
+  --twitter-per-hour=N      Twitter request budget (default: 30)
+  --min-refresh-hours=H     Don't refresh a paper more often than this (default: 6)
+  --render-minutes=MIN      Minimum minutes between re-renders (default: 10)
+  --no-render               Don't regenerate the HTML visualization
+  --help                    Show this help message
+
+Refresh jobs are stored in the 'refresh_queue' MongoDB collection, so the
+queue survives restarts. New papers are refreshed first, then papers by
+age and by how quickly their metrics have been changing.
+
+Examples:
+  python arxiv_scheduler.py
+  python arxiv_scheduler.py --scholar-per-hour=20 --render-minutes=30
+""")
+            sys.exit(0)
+        elif arg == "--no-render":
+            options["render"] = False
+        elif arg.startswith("--keywords="):
+            keywords_file = arg.split("=")[1]
+        elif "=" in arg and arg.split("=")[0] + "=" in numeric_args:
+            flag, value = arg.split("=", 1)
+            name, cast = numeric_args[flag + "="]
+            try:
+                number = cast(value)
+            except ValueError:
+                number = None
+            if number is None or number <= 0:
+                print(f"Error: {flag} must be a positive number")
+                sys.exit(1)
+            options[name] = number
+        else:
+            print(f"Unknown argument: {arg}")
+            sys.exit(1)
+
+    keywords = read_keywords(keywords_file)
+    if not keywords:
+        print("Error: No keywords found. Please provide a valid keywords file.")
+        sys.exit(1)
+
+    # Let service managers stop the daemon cleanly
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    scheduler = RefreshScheduler(keywords, **options)
+    scheduler.run()
+
+if __name__ == "__main__":
+    main()
@@ -6,8 +6,8 @@ import webbrowser
 from arxiv_db import ArxivDatabase
 
 class ArxivVisualizer:
-    def __init__(self):
-        self.db = ArxivDatabase()
+    def __init__(self, db=None):
+        self.db = db if db is not None else ArxivDatabase()
     
     def get_all_papers(self):
         return self.db.get_all_papers()
@@ -51,7 +51,8 @@ class ArxivVisualizer:
         
         return list_path
         
-    def generate_html(self, output_file="arxiv_papers.html", title="ArXiv AI Security Papers"):
+    def generate_html(self, output_file="arxiv_papers.html", title="ArXiv AI Security Papers", snapshot=True):
+        """Render the paper list; with snapshot=False only main.html and the output file are rewritten"""
         papers = self.get_all_papers()
         
         if not papers:
@@ -87,8 +88,9 @@ class ArxivVisualizer:
                 'title': paper.get('title', 'Untitled Paper'),
                 'authors': paper.get('authors', []),
                 'published': paper.get('published', ''),
-                'citations': paper.get('citations', 0) or 0,
-                'tweets': paper.get('tweets', 0) or 0,
+                # None means the metric is unknown; the page shows it as such
+                'citations': paper.get('citations'),
+                'tweets': paper.get('tweets'),
                 'paper_link': paper.get('abstract_link', f'https://arxiv.org/abs/{paper.get("arxiv_id", "")}'),
                 'categories': paper.get('categories', []),
                 'abstract': paper.get('abstract', '')
@@ -111,21 +113,22 @@ class ArxivVisualizer:
         with open(output_path, 'w') as f:
             f.write(html)
             
-        # Save to timestamped file in renders directory
-        with open(timestamped_path, 'w') as f:
-            f.write(html)
-            
-        # Also save to main.html in renders directory
+        # Save to main.html in renders directory
         with open(main_path, 'w') as f:
             f.write(html)
             
-        # Generate the list.html file with all renders
-        list_path = self.generate_renders_list_html()
-        
         print(f"HTML visualization generated:")
-        print(f"  - Timestamped version: {os.path.abspath(timestamped_path)}")
+        if snapshot:
+            # Save to timestamped file in renders directory
+            with open(timestamped_path, 'w') as f:
+                f.write(html)
+                
+            # Generate the list.html file with all renders
+            list_path = self.generate_renders_list_html()
+            
+            print(f"  - Timestamped version: {os.path.abspath(timestamped_path)}")
+            print(f"  - History list: {os.path.abspath(list_path)}")
         print(f"  - Main version: {os.path.abspath(main_path)}")
-        print(f"  - History list: {os.path.abspath(list_path)}")
         print(f"  - Original path: {os.path.abspath(output_path)}")
         
         # Return the main.html path as the primary output
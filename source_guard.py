@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+import time
+import random
+import datetime
+import email.utils
+
+THROTTLE_STATUSES = (429, 503)
+
+class SourceUnavailable(Exception):
+    pass
+
+class RetryableError(Exception):
+    def __init__(self, reason, status_code=None, retry_after=None):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+def parse_retry_after(value):
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=datetime.timezone.utc)
+
+    return max(0.0, (retry_at - datetime.datetime.now(datetime.timezone.utc)).total_seconds())
+
+def backoff_delay(attempt, base_delay=2.0, max_delay=60.0, retry_after=None):
+    # Full jitter: a random wait up to the exponential ceiling, but never
+    # shorter than what the server asked for
+    delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+class CircuitBreaker:
+    def __init__(self, name, failure_threshold=3, reset_timeout=600.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.open_until = None
+
+    def is_open(self):
+        return self.open_until is not None and time.monotonic() < self.open_until
+
+    def allow(self):
+        # Once the timeout has passed, calls go through again; the first
+        # failure after that re-opens the circuit since the count is kept
+        return not self.is_open()
+
+    def record_success(self):
+        self.failures = 0
+        self.open_until = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.failure_threshold:
+            self.trip()
+
+    def trip(self, duration=None):
+        duration = self.reset_timeout if duration is None else duration
+        self.open_until = time.monotonic() + duration
+        print(f"Circuit for {self.name} opened for {duration:.0f}s after {self.failures} failures")
+
+class ResilientSource:
+    def __init__(self, name, max_retries=3, base_delay=2.0, max_delay=60.0,
+                 failure_threshold=3, reset_timeout=600.0, budget=None):
+        self.name = name
+        # Optional RateBudget, charged for every attempt including retries
+        self.budget = budget
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = CircuitBreaker(name, failure_threshold, reset_timeout)
+
+    def available(self):
+        return self.breaker.allow()
+
+    def call(self, func, *args, **kwargs):
+        for attempt in range(self.max_retries + 1):
+            if not self.breaker.allow():
+                raise SourceUnavailable(f"{self.name} circuit is open, skipping request")
+
+            if self.budget is not None:
+                self.budget.acquire()
+
+            try:
+                result = func(*args, **kwargs)
+            except RetryableError as e:
+                if e.status_code in THROTTLE_STATUSES:
+                    self.breaker.record_failure()
+
+                if attempt == self.max_retries or not self.breaker.allow():
+                    break
+                if e.retry_after is not None and e.retry_after > self.max_delay:
+                    # Not worth blocking the run; stop calling until the server is ready
+                    self.breaker.trip(e.retry_after)
+                    break
+
+                delay = backoff_delay(attempt, self.base_delay, self.max_delay, e.retry_after)
+                print(f"{self.name}: {e}, retrying in {delay:.1f}s ({attempt + 1}/{self.max_retries})")
+                time.sleep(delay)
+                continue
+
+            self.breaker.record_success()
+            return result
+
+        raise SourceUnavailable(f"{self.name} did not respond successfully after {attempt + 1} attempts")
+
+class RateBudget:
+    # Token bucket; the default burst of one spaces requests evenly over the hour
+    def __init__(self, per_hour, burst=1):
+        if per_hour <= 0:
+            raise ValueError("per_hour must be positive")
+        self.rate = per_hour / 3600.0
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self):
+        self._refill()
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def acquire(self):
+        delay = self.wait_time()
+        if delay > 0:
+            time.sleep(delay)
+            self._refill()
+        self.tokens -= 1
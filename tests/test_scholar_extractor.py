@@ -0,0 +1,132 @@
+import re
+import time
+
+from bs4 import BeautifulSoup
+
+from arxiv_collector import extract_scholar_citations, is_scholar_block_page
+
+HEADER = '''<html><head><style>{styles}</style><script>{scripts}</script></head><body>
+<form id="gs_hdr_frm"><input name="q" value="arXiv:{query}"></form>
+<div id="gs_res_ccl_mid">
+'''
+
+FOOTER = '''</div>
+<div id="gs_res_ccl_bot"><div id="gs_n"><a href="/scholar?start=10&amp;q=arXiv%3A{query}&amp;hl=en">Next</a></div></div>
+<div id="gs_ftr"><a href="/scholar?q=arXiv%3A{query}&amp;hl=en&amp;as_sdt=0,5">Search help</a></div>
+</body></html>
+'''
+
+def result(link, cited_by=None, classes="gs_r gs_or gs_scl", snippet="A paper about things."):
+    cited = f'<a href="/scholar?cites=123&amp;hl=en">Cited by {cited_by}</a>' if cited_by is not None else ''
+    return f'''<div class="{classes}" data-cid="abc"><div class="gs_ri">
+<h3 class="gs_rt"><a href="{link}">Some title</a></h3>
+<div class="gs_a">A Author, B Author - 2023 - venue</div>
+<div class="gs_rs">{snippet}</div>
+<div class="gs_fl gs_flb">{cited}<a href="/scholar?q=related:abc:scholar.google.com/">Related articles</a></div>
+</div></div>
+'''
+
+def page(query, results, padding=0):
+    return (HEADER.format(query=query, styles="x" * padding, scripts="y" * padding)
+            + "".join(results) + FOOTER.format(query=query))
+
+def test_matches_versioned_link():
+    html = page("2307.15043", [result("https://arxiv.org/abs/2307.15043v2", cited_by=900)])
+    assert extract_scholar_citations(html, "2307.15043") == 900
+
+def test_picks_the_result_for_this_paper_not_the_first():
+    html = page("2307.15043", [
+        result("https://venue.org/other", cited_by=7),
+        result("https://arxiv.org/pdf/2307.15043", cited_by=42),
+    ])
+    assert extract_scholar_citations(html, "2307.15043") == 42
+
+def test_prefix_id_does_not_match_longer_id():
+    html = page("2307.1504", [
+        result("https://arxiv.org/abs/2307.15043", cited_by=900),
+        result("https://arxiv.org/abs/2307.1504", cited_by=5),
+    ])
+    assert extract_scholar_citations(html, "2307.1504") == 5
+
+def test_query_in_search_box_and_footer_does_not_match():
+    html = page("2401.00001", [
+        result("https://venue.org/a", cited_by=7),
+        result("https://venue.org/b", cited_by=3),
+    ])
+    assert extract_scholar_citations(html, "2401.00001") is None
+
+def test_matched_result_without_cited_by_is_zero():
+    html = page("2401.00001", [result("https://arxiv.org/abs/2401.00001")])
+    assert extract_scholar_citations(html, "2401.00001") == 0
+
+def test_class_order_does_not_matter():
+    html = page("2401.00001", [
+        result("https://venue.org/a", cited_by=7, classes="gs_or gs_scl gs_r"),
+        result("https://arxiv.org/abs/2401.00001", cited_by=11, classes="gs_or gs_r"),
+    ])
+    assert extract_scholar_citations(html, "2401.00001") == 11
+
+def test_id_in_author_line():
+    html = page("2401.00001", [result("https://venue.org/a", cited_by=8,
+                                      snippet="arXiv preprint arXiv:2401.00001, 2024")])
+    assert extract_scholar_citations(html, "2401.00001") == 8
+
+def test_unrecognized_result_markup_falls_back_to_full_parse():
+    html = '''<html><body><div class="gs_ri"><h3><a href="https://arxiv.org/abs/2401.00001">T</a></h3>
+<div class="gs_fl"><a>Cited by 13</a></div></div></body></html>'''
+    assert extract_scholar_citations(html, "2401.00001") == 13
+
+def test_page_without_results_is_unknown():
+    html = '<html><body><div id="gs_captcha_ccl">Please show you are not a robot</div></body></html>'
+    assert extract_scholar_citations(html, "2401.00001") is None
+
+def test_captcha_pages_are_detected():
+    captcha = '<html><body><div id="gs_captcha_ccl"><div class="g-recaptcha"></div></div></body></html>'
+    unusual = "<html><body>Our systems have detected unusual traffic from your computer network.</body></html>"
+    assert is_scholar_block_page(captcha)
+    assert is_scholar_block_page(unusual)
+    assert is_scholar_block_page("", "https://www.google.com/sorry/index?continue=https://scholar.google.com/")
+
+def test_results_mentioning_unusual_traffic_are_not_a_block_page():
+    html = page("2401.00001", [result("https://arxiv.org/abs/2401.00001", cited_by=4,
+                                      snippet="Detecting unusual traffic in LLM agents")])
+    assert not is_scholar_block_page(html, "https://scholar.google.com/scholar?q=arXiv%3A2401.00001")
+
+def legacy_extract(html):
+    # The full-parse extractor this module replaced
+    soup = BeautifulSoup(html, 'html.parser')
+    for part in soup.find_all('div', class_='gs_fl'):
+        if 'Cited by' in part.text:
+            citation_match = re.search(r'Cited by (\d+)', part.text)
+            if citation_match:
+                return int(citation_match.group(1))
+    return 0
+
+def benchmark_page():
+    # Roughly the shape of a real results page: heavy inline head, ten results
+    return page("2307.15043", [result("https://arxiv.org/abs/2307.15043", cited_by=900)]
+                + [result(f"https://venue.org/{i}", cited_by=i) for i in range(9)], padding=60000)
+
+def time_per_call(func, *args, repeat=20):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(*args)
+    return (time.perf_counter() - start) / repeat
+
+def test_targeted_extractor_is_much_faster_than_full_parse():
+    html = benchmark_page()
+    assert extract_scholar_citations(html, "2307.15043") == legacy_extract(html) == 900
+
+    fast = time_per_call(extract_scholar_citations, html, "2307.15043")
+    full = time_per_call(legacy_extract, html)
+    # Loose bound to keep this stable on slow machines; typically far larger
+    assert full > 5 * fast
+
+if __name__ == "__main__":
+    # PYTHONPATH=. python tests/test_scholar_extractor.py
+    html = benchmark_page()
+    fast = time_per_call(extract_scholar_citations, html, "2307.15043", repeat=200)
+    full = time_per_call(legacy_extract, html, repeat=200)
+    print(f"Page size: {len(html) / 1024:.0f} KiB")
+    print(f"Full BeautifulSoup parse: {full * 1000:.2f} ms per page")
+    print(f"Targeted extractor:       {fast * 1000:.3f} ms per page ({full / fast:.0f}x faster)")
@@ -0,0 +1,73 @@
+import httpx
+import pytest
+
+import twitter_search
+from source_guard import ResilientSource
+
+def cursor(kind):
+    return {'entryId': f'cursor-{kind.lower()}-1', 'content': {'cursorType': kind, 'value': kind}}
+
+def tweet(i):
+    return {'entryId': f'tweet-{i}', 'content': {}}
+
+def timeline(*entries):
+    return {'data': {'search_by_raw_query': {'search_timeline': {'timeline': {
+        'instructions': [{'type': 'TimelineAddEntries', 'entries': list(entries)}]}}}}}
+
+@pytest.fixture
+def twitter(monkeypatch, tmp_path):
+    # Search.run creates its output directory in the working directory
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("TWITTER_AUTH_TOKEN", "auth")
+    monkeypatch.setenv("TWITTER_CT0_TOKEN", "ct0")
+    monkeypatch.setattr(twitter_search.time, "sleep", lambda seconds: None)
+    responses = []
+
+    def handler(request):
+        return responses.pop(0) if len(responses) > 1 else responses[0]
+
+    real_client = twitter_search.AsyncClient
+    monkeypatch.setattr(twitter_search, "AsyncClient",
+                        lambda **kwargs: real_client(transport=httpx.MockTransport(handler), **kwargs))
+    search = twitter_search.TwitterSearch()
+    source = ResilientSource('twitter-test', max_retries=2, base_delay=0, failure_threshold=2)
+    return search, source, responses
+
+def test_search_without_tweets_is_a_real_zero(twitter):
+    search, source, responses = twitter
+    responses.append(httpx.Response(200, json=timeline(cursor('Top'), cursor('Bottom'))))
+
+    assert search.fetch_tweet_count("2401.00001", source=source) == 0
+    assert source.available()
+    assert source.breaker.failures == 0
+
+def test_tweets_are_counted(twitter):
+    search, source, responses = twitter
+    responses.append(httpx.Response(200, json=timeline(tweet(1), tweet(2), cursor('Top'), cursor('Bottom'))))
+    responses.append(httpx.Response(200, json=timeline(cursor('Top'), cursor('Bottom'))))
+
+    assert search.fetch_tweet_count("2307.15043", source=source) == 2
+
+def test_http_429_trips_the_breaker(twitter):
+    search, source, responses = twitter
+    responses.append(httpx.Response(429, text="Rate limit exceeded"))
+
+    with pytest.raises(twitter_search.SourceUnavailable):
+        search.fetch_tweet_count("2401.00001", source=source)
+    assert not source.available()
+
+def test_rate_limit_errors_payload_is_throttling(twitter):
+    search, source, responses = twitter
+    responses.append(httpx.Response(200, json={'errors': [{'code': 88, 'message': 'Rate limit exceeded'}]}))
+
+    with pytest.raises(twitter_search.SourceUnavailable):
+        search.fetch_tweet_count("2401.00001", source=source)
+    assert not source.available()
+
+def test_other_api_errors_are_unknown_without_breaker_failure(twitter):
+    search, source, responses = twitter
+    responses.append(httpx.Response(200, json={'errors': [{'code': 131, 'message': 'Internal error'}]}))
+
+    with pytest.raises(RuntimeError):
+        search.fetch_tweet_count("2401.00001", source=source)
+    assert source.breaker.failures == 0
@@ -1,8 +1,54 @@
 #!/usr/bin/env python3
 import os
 import time
+import asyncio
 from dotenv import load_dotenv
+from httpx import AsyncClient
 from twitter.search import Search
+from twitter.util import get_headers
+from source_guard import ResilientSource, RetryableError, SourceUnavailable, THROTTLE_STATUSES, parse_retry_after
+
+TWITTER = ResilientSource('twitter', max_retries=2, base_delay=5.0)
+
+# Error code the API uses for "Rate limit exceeded" in an errors payload
+RATE_LIMIT_ERROR_CODE = 88
+
+class StatusTrackingSearch(Search):
+    # Search.run hides what the API answered: an errors payload (rate limits
+    # included) comes back as an empty result, just like a search with no
+    # tweets, and a non-JSON 429 only surfaces as a TypeError. Keep the last
+    # HTTP response and any API errors so callers can tell these apart.
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.reset_status()
+
+    def reset_status(self):
+        self.last_status = None
+        self.last_headers = {}
+        self.api_errors = []
+
+    async def process(self, queries, limit, out, **kwargs):
+        async with AsyncClient(headers=get_headers(self.session),
+                               event_hooks={'response': [self._record_response]}) as s:
+            return await asyncio.gather(*(self.paginate(s, q, limit, out, **kwargs) for q in queries))
+
+    async def _record_response(self, response):
+        self.last_status = response.status_code
+        self.last_headers = response.headers
+
+    async def backoff(self, fn, **kwargs):
+        async def tracked():
+            data, entries, cursor = await fn()
+            self.api_errors.extend(data.get('errors') or [])
+            return data, entries, cursor
+        return await super().backoff(tracked, **kwargs)
+
+    def retry_after(self):
+        retry_after = parse_retry_after(self.last_headers.get('Retry-After'))
+        reset = self.last_headers.get('x-rate-limit-reset', '')
+        if retry_after is None and reset.isdigit():
+            retry_after = max(0.0, int(reset) - time.time())
+        return retry_after
 
 class TwitterSearch:
     def __init__(self):
@@ -11,32 +57,64 @@ class TwitterSearch:
         self.ct0_token = os.environ.get("TWITTER_CT0_TOKEN")
         self.api_client = None
         if self.auth_token and self.ct0_token:
-            self.api_client = Search(cookies={"auth_token": self.auth_token, "ct0": self.ct0_token})
+            self.api_client = StatusTrackingSearch(cookies={"auth_token": self.auth_token, "ct0": self.ct0_token})
+        
+    def _search(self, arxiv_id):
+        # Retries are left to TWITTER, so the client makes a single attempt
+        client = self.api_client
+        client.reset_status()
+        error = None
+        try:
+            results = client.run(
+                limit=100,
+                retries=0,
+                queries=[{'category': 'Top', 'query': arxiv_id}],
+                save=False
+            )
+        except Exception as e:
+            error = e
+        
+        rate_limited = any(e.get('code') == RATE_LIMIT_ERROR_CODE for e in client.api_errors)
+        if client.last_status in THROTTLE_STATUSES or rate_limited:
+            status_code = client.last_status if client.last_status in THROTTLE_STATUSES else 429
+            raise RetryableError(f"rate limited (status {status_code})", status_code, client.retry_after())
+        if error is not None:
+            if client.last_status is None:
+                raise RetryableError(f"no response from Twitter: {error}")
+            raise error
+        if client.api_errors:
+            raise RuntimeError(f"Twitter API error: {client.api_errors[0].get('message')}")
+        
+        # A well-formed page without tweets is a real zero
+        return results
+        
+    def fetch_tweet_count(self, arxiv_id, source=TWITTER):
+        # Raises SourceUnavailable when the circuit is open or retries ran out
+        results = source.call(self._search, arxiv_id)
+        tweet_count = 0
+        for category_results in results:
+            for tweet_data in category_results:
+                if 'entryId' in tweet_data and tweet_data['entryId'].startswith('tweet-'):
+                    tweet_count += 1
+        return tweet_count
         
     def get_tweet_count(self, arxiv_id, delay=5.0):
+        # None means the count is unknown, so stored data is left alone
         if not self.api_client:
-            return 0
+            return None
             
         try:
             # Always wait 5 seconds before making a request to avoid rate limits
-            time.sleep(5)
+            if TWITTER.available():
+                time.sleep(5)
             
-            results = self.api_client.run(
-                limit=100,
-                retries=2,
-                queries=[{'category': 'Top', 'query': arxiv_id}],
-                save=False
-            )
-            tweet_count = 0
-            if results and isinstance(results, list) and len(results) > 0:
-                for category_results in results:
-                    for tweet_data in category_results:
-                        if 'entryId' in tweet_data and tweet_data['entryId'].startswith('tweet-'):
-                            tweet_count += 1
-            return tweet_count
+            return self.fetch_tweet_count(arxiv_id)
+        except SourceUnavailable as e:
+            print(f"Skipping Twitter search: {e}")
+            return None
         except Exception as e:
             print(f"Error searching Twitter: {e}")
-            return 0
+            return None
 
 if __name__ == "__main__":
     import sys